@@ -4,6 +4,11 @@ Calendly Doctor Appointment System - Configuration Package
 
 from config.appointment_types import (
     APPOINTMENT_TYPES,
+    APPOINTMENT_TYPE_KEYS,
+    APPOINTMENT_TYPE_RECORDS,
+    APPOINTMENT_TYPE_NAMES,
+    APPOINTMENT_TYPE_LABELS,
+    APPOINTMENT_TYPES_SUMMARY,
     get_appointment_duration,
     get_all_appointment_types,
     get_appointment_info
@@ -11,6 +16,11 @@ from config.appointment_types import (
 
 __all__ = [
     'APPOINTMENT_TYPES',
+    'APPOINTMENT_TYPE_KEYS',
+    'APPOINTMENT_TYPE_RECORDS',
+    'APPOINTMENT_TYPE_NAMES',
+    'APPOINTMENT_TYPE_LABELS',
+    'APPOINTMENT_TYPES_SUMMARY',
     'get_appointment_duration',
     'get_all_appointment_types',
     'get_appointment_info'
@@ -3,6 +3,8 @@ Appointment Types Configuration
 Defines different appointment types with their durations
 """
 
+from types import MappingProxyType
+
 APPOINTMENT_TYPES = {
     "general_consultation": {
         "name": "General Consultation",
@@ -26,6 +28,32 @@ APPOINTMENT_TYPES = {
     }
 }
 
+# Freeze the table (and each entry) so shared consumers cannot mutate it
+APPOINTMENT_TYPES = MappingProxyType(
+    {key: MappingProxyType(info) for key, info in APPOINTMENT_TYPES.items()}
+)
+
+# Precomputed views of the static table, built once at import time
+APPOINTMENT_TYPE_KEYS = tuple(APPOINTMENT_TYPES)
+APPOINTMENT_TYPE_RECORDS = tuple(
+    {'key': key, **info} for key, info in APPOINTMENT_TYPES.items()
+)
+APPOINTMENT_TYPE_NAMES = {key: info['name'] for key, info in APPOINTMENT_TYPES.items()}
+APPOINTMENT_TYPE_LABELS = {
+    key: f"{info['name']} ({info['duration']} min)" for key, info in APPOINTMENT_TYPES.items()
+}
+
+_durations = tuple(info['duration'] for info in APPOINTMENT_TYPES.values())
+APPOINTMENT_TYPES_SUMMARY = {
+    'total_types': len(APPOINTMENT_TYPES),
+    'shortest_duration': min(_durations),
+    'longest_duration': max(_durations),
+    'average_duration': sum(_durations) / len(_durations)
+}
+
+# Bound lookup shared by the accessors below
+_get_type = APPOINTMENT_TYPES.get
+
 def get_appointment_duration(appointment_type):
     """
     Get duration for a specific appointment type
@@ -36,16 +64,15 @@ def get_appointment_duration(appointment_type):
     Returns:
         int: Duration in minutes, or None if type not found
     """
-    if appointment_type in APPOINTMENT_TYPES:
-        return APPOINTMENT_TYPES[appointment_type]["duration"]
-    return None
+    info = _get_type(appointment_type)
+    return info["duration"] if info is not None else None
 
 def get_all_appointment_types():
     """
     Get all available appointment types
     
     Returns:
-        dict: Dictionary of all appointment types
+        MappingProxyType: Read-only mapping of all appointment types
     """
     return APPOINTMENT_TYPES
 
@@ -57,6 +84,6 @@ def get_appointment_info(appointment_type):
         appointment_type (str): Type of appointment
         
     Returns:
-        dict: Appointment type information or None
+        MappingProxyType: Read-only appointment type information or None
     """
-    return APPOINTMENT_TYPES.get(appointment_type)
+    return _get_type(appointment_type)
@@ -5,20 +5,27 @@ Interactive web-based dashboard for managing appointments
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
-import sys
+import logging
+import logging.handlers
 import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import queue
 
 from src.doctor_schedule import DoctorSchedule
 from src.available_slots import AvailableSlots
 from src.appointment_booking import AppointmentBooking
 from src.appointment_type_handler import AppointmentTypeHandler
-from config.appointment_types import APPOINTMENT_TYPES
+from config.appointment_types import (
+    APPOINTMENT_TYPES,
+    APPOINTMENT_TYPE_KEYS,
+    APPOINTMENT_TYPE_NAMES,
+    APPOINTMENT_TYPE_LABELS
+)
+
+_MIDNIGHT = datetime.min.time()
 
 # Page configuration
 st.set_page_config(
@@ -29,62 +36,166 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        padding: 1rem;
-        background: linear-gradient(90deg, #e3f2fd 0%, #bbdefb 100%);
-        border-radius: 10px;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #1f77b4;
-    }
-    .success-box {
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .error-box {
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .info-box {
-        background-color: #d1ecf1;
-        border: 1px solid #bee5eb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    </style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def _load_css():
+    css_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'style.css')
+    with open(css_path) as css_file:
+        return f"<style>{css_file.read()}</style>"
+
+st.markdown(_load_css(), unsafe_allow_html=True)
+
+# Route log records through a queue so worker threads never block on stream I/O
+@st.cache_resource
+def _start_log_listener():
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    return listener
+
+_start_log_listener()
 
 # Initialize session state
-if 'booking_history' not in st.session_state:
-    st.session_state.booking_history = []
+if 'booking_df' not in st.session_state:
+    st.session_state.booking_df = pd.DataFrame(
+        columns=['booking_id', 'date', 'time', 'patient', 'type', 'timestamp']
+    )
+
+# Initialize classes lazily, one cached instance per manager; the managers
+# share one schedule so invalidation after a booking reaches every page
+@st.cache_resource
+def _schedule():
+    return DoctorSchedule()
 
-# Initialize classes
 @st.cache_resource
-def get_managers():
-    return {
-        'schedule': DoctorSchedule(),
-        'slots': AvailableSlots(),
-        'booking': AppointmentBooking(),
-        'types': AppointmentTypeHandler()
-    }
+def _slots():
+    return AvailableSlots(_schedule())
+
+@st.cache_resource
+def _booking():
+    return AppointmentBooking(_slots())
+
+@st.cache_resource
+def _types():
+    return AppointmentTypeHandler()
+
+# Cached computations (plain data, safe to reuse across reruns)
+@st.cache_data(ttl=300, show_spinner=False)
+def _compute_week_overview(date_key):
+    days, dates, statuses = [], [], []
+    working_mask = _schedule().working_mask
+    week_start = datetime.combine(date_key, _MIDNIGHT)
+    for i in range(7):
+        check_date = week_start + timedelta(days=i)
+        is_working = working_mask[check_date.weekday()]
+        days.append(check_date.strftime('%A'))
+        dates.append(check_date.strftime('%Y-%m-%d'))
+        statuses.append('✅ Working' if is_working else '❌ Off')
+    return pd.DataFrame({'Day': days, 'Date': dates, 'Status': statuses})
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _compute_trends(date_key, keys):
+    dates, types, slots = [], [], []
+    today = datetime.combine(date_key, _MIDNIGHT)
+    get_slots = _slots().get_available_slots
+    
+    # One busy-slots fetch for the whole window, shared by every type
+    check_dates = [today + timedelta(days=i) for i in range(14)]
+    busy_by_day = _schedule().get_busy_time_slots_range(check_dates[0], check_dates[-1])
+    day_busy = [busy_by_day.get(d.strftime('%Y-%m-%d'), []) for d in check_dates]
+    
+    for apt_type_key in keys:
+        type_name = APPOINTMENT_TYPE_NAMES[apt_type_key]
+        for check_date, busy_slots in zip(check_dates, day_busy):
+            slots_info = get_slots(check_date, apt_type_key, busy_slots)
+            
+            dates.append(slots_info['date'])
+            types.append(type_name)
+            slots.append(slots_info['total_slots'])
+    
+    return pd.DataFrame({'Date': dates, 'Type': types, 'Available Slots': slots})
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _compute_capacity():
+    days, total_minutes = _schedule().working_minutes_array
+    return pd.DataFrame({
+        'Day': days,
+        'Total Minutes': total_minutes,
+        'Potential 30-min Slots': total_minutes // 30,
+        'Potential 60-min Slots': total_minutes // 60
+    })
 
-managers = get_managers()
+@st.cache_data(show_spinner=False)
+def _types_df():
+    return pd.DataFrame(_types().list_all_types())
+
+@st.cache_data(show_spinner=False)
+def _timeline_fig(slots_df, date_str):
+    fig = px.scatter(
+        slots_df,
+        x='start_time',
+        y=np.ones(len(slots_df), np.int8),
+        title=f"Available Slots Timeline - {date_str}",
+        labels={'start_time': 'Time', 'y': ''},
+        height=200
+    )
+    fig.update_yaxes(showticklabels=False)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _durations_fig(types_df):
+    return px.bar(
+        types_df,
+        x='name',
+        y='duration',
+        title='Appointment Durations',
+        labels={'name': 'Appointment Type', 'duration': 'Duration (minutes)'},
+        color='duration',
+        color_continuous_scale='Viridis'
+    )
+
+@st.cache_data(show_spinner=False)
+def _trend_fig(df_trends):
+    return px.line(
+        df_trends,
+        x='Date',
+        y='Available Slots',
+        color='Type',
+        title='Available Slots Over Time',
+        markers=True
+    )
+
+@st.cache_data(show_spinner=False)
+def _distribution_fig(df_types):
+    return px.pie(
+        df_types,
+        names='name',
+        values='duration',
+        title='Time Distribution by Appointment Type'
+    )
+
+@st.cache_data(show_spinner=False)
+def _capacity_fig(df_capacity):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=df_capacity['Day'],
+        y=df_capacity['Potential 30-min Slots'],
+        name='30-min Slots'
+    ))
+    fig.add_trace(go.Bar(
+        x=df_capacity['Day'],
+        y=df_capacity['Potential 60-min Slots'],
+        name='60-min Slots'
+    ))
+    fig.update_layout(
+        title='Daily Appointment Capacity',
+        barmode='group',
+        xaxis_title='Day',
+        yaxis_title='Number of Slots'
+    )
+    return fig
 
 # Header
 st.markdown('<h1 class="main-header">🏥 Doctor Appointment System</h1>', unsafe_allow_html=True)
@@ -101,6 +212,9 @@ page = st.sidebar.radio(
 # ==================== DASHBOARD PAGE ====================
 if page == "🏠 Dashboard":
     st.header("Dashboard Overview")
+    now = datetime.now()
+    today_date = now.date()
+    today_summary = _schedule().get_schedule_summary(now)
     
     # Quick stats
     col1, col2, col3, col4 = st.columns(4)
@@ -112,25 +226,21 @@ if page == "🏠 Dashboard":
         )
     
     with col2:
-        today = datetime.now()
-        schedule_summary = managers['schedule'].get_schedule_summary(today)
         st.metric(
             label="📅 Today's Appointments",
-            value=schedule_summary['total_appointments']
+            value=today_summary['total_appointments']
         )
     
     with col3:
-        working_hours = managers['schedule'].get_working_hours()
-        working_days = sum(1 for day, hours in working_hours.items() if hours['available'])
         st.metric(
             label="🗓️ Working Days/Week",
-            value=working_days
+            value=_schedule().working_days_count
         )
     
     with col4:
         st.metric(
             label="📝 Session Bookings",
-            value=len(st.session_state.booking_history)
+            value=len(st.session_state.booking_df)
         )
     
     st.markdown("---")
@@ -140,20 +250,23 @@ if page == "🏠 Dashboard":
     
     with col1:
         st.subheader("📅 Today's Schedule")
-        today_summary = managers['schedule'].get_schedule_summary(datetime.now())
-        
-        st.write(f"**Date:** {today_summary['date']}")
-        st.write(f"**Day:** {today_summary['day_of_week']}")
         
+        details = (
+            f"**Date:** {today_summary['date']}  \n"
+            f"**Day:** {today_summary['day_of_week']}"
+        )
         if today_summary['working_hours'].get('available'):
-            st.write(f"**Working Hours:** {today_summary['working_hours']['start']} - {today_summary['working_hours']['end']}")
+            details += f"  \n**Working Hours:** {today_summary['working_hours']['start']} - {today_summary['working_hours']['end']}"
+            st.markdown(details)
         else:
+            st.markdown(details)
             st.info("Not a working day today")
         
         if today_summary['appointments']:
-            st.write(f"**Appointments:** {today_summary['total_appointments']}")
-            for apt in today_summary['appointments']:
-                st.write(f"- {apt['name']} at {apt['start_time']}")
+            st.markdown(
+                f"**Appointments:** {today_summary['total_appointments']}\n\n"
+                + "\n".join(f"- {apt.name} at {apt.start_time}" for apt in today_summary['appointments'])
+            )
         else:
             st.success("No appointments scheduled for today")
     
@@ -162,18 +275,20 @@ if page == "🏠 Dashboard":
         
         apt_type = st.selectbox(
             "Select appointment type",
-            options=list(APPOINTMENT_TYPES.keys()),
-            format_func=lambda x: APPOINTMENT_TYPES[x]['name'],
+            options=APPOINTMENT_TYPE_KEYS,
+            format_func=APPOINTMENT_TYPE_NAMES.__getitem__,
             key="dashboard_apt_type"
         )
         
-        next_slot = managers['slots'].get_next_available_slot(apt_type)
+        next_slot = _slots().get_next_available_slot(apt_type)
         
         if next_slot['found']:
             st.success("✅ Slot Found!")
-            st.write(f"**Date:** {next_slot['date']}")
-            st.write(f"**Time:** {next_slot['slot']['start_time']} - {next_slot['slot']['end_time']}")
-            st.write(f"**Duration:** {next_slot['duration']} minutes")
+            st.markdown(
+                f"**Date:** {next_slot['date']}  \n"
+                f"**Time:** {next_slot['slot']['start_time']} - {next_slot['slot']['end_time']}  \n"
+                f"**Duration:** {next_slot['duration']} minutes"
+            )
         else:
             st.warning(next_slot['message'])
     
@@ -181,22 +296,14 @@ if page == "🏠 Dashboard":
     st.markdown("---")
     st.subheader("📆 This Week Overview")
     
-    week_data = []
-    for i in range(7):
-        check_date = datetime.now() + timedelta(days=i)
-        is_working = managers['schedule'].is_working_day(check_date)
-        week_data.append({
-            'Day': check_date.strftime('%A'),
-            'Date': check_date.strftime('%Y-%m-%d'),
-            'Status': '✅ Working' if is_working else '❌ Off'
-        })
-    
-    df_week = pd.DataFrame(week_data)
+    df_week = _compute_week_overview(today_date)
     st.dataframe(df_week, use_container_width=True, hide_index=True)
 
 # ==================== BOOK APPOINTMENT PAGE ====================
 elif page == "📅 Book Appointment":
     st.header("Book New Appointment")
+    now = datetime.now()
+    today_date = now.date()
     
     with st.form("booking_form"):
         col1, col2 = st.columns(2)
@@ -206,19 +313,19 @@ elif page == "📅 Book Appointment":
             
             apt_type = st.selectbox(
                 "Appointment Type *",
-                options=list(APPOINTMENT_TYPES.keys()),
-                format_func=lambda x: f"{APPOINTMENT_TYPES[x]['name']} ({APPOINTMENT_TYPES[x]['duration']} min)"
+                options=APPOINTMENT_TYPE_KEYS,
+                format_func=APPOINTMENT_TYPE_LABELS.__getitem__
             )
             
             apt_date = st.date_input(
                 "Appointment Date *",
-                min_value=datetime.now().date(),
-                max_value=datetime.now().date() + timedelta(days=90)
+                min_value=today_date,
+                max_value=today_date + timedelta(days=90)
             )
             
             # Get available slots for selected date
-            check_datetime = datetime.combine(apt_date, datetime.min.time())
-            slots_info = managers['slots'].get_available_slots(check_datetime, apt_type)
+            check_datetime = datetime.combine(apt_date, _MIDNIGHT)
+            slots_info = _slots().get_available_slots(check_datetime, apt_type)
             
             if slots_info.get('available_slots'):
                 time_options = [slot['start_time'] for slot in slots_info['available_slots']]
@@ -251,30 +358,34 @@ elif page == "📅 Book Appointment":
                     'notes': notes
                 }
                 
-                result = managers['booking'].create_appointment(appointment_data)
+                result = _booking().create_appointment(appointment_data)
                 
                 if result['success']:
                     st.success("✅ Appointment Booked Successfully!")
                     
                     # Add to session history
-                    st.session_state.booking_history.append({
-                        'booking_id': result['booking_id'],
-                        'date': apt_date.strftime('%Y-%m-%d'),
-                        'time': apt_time,
-                        'patient': patient_name,
-                        'type': APPOINTMENT_TYPES[apt_type]['name'],
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
+                    booking_df = st.session_state.booking_df
+                    booking_df.loc[len(booking_df)] = [
+                        result['booking_id'],
+                        apt_date.strftime('%Y-%m-%d'),
+                        apt_time,
+                        patient_name,
+                        APPOINTMENT_TYPE_NAMES[apt_type],
+                        now.strftime('%Y-%m-%d %H:%M:%S')
+                    ]
                     
                     # Display booking details
                     st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.write("**Booking Confirmation**")
-                    st.write(f"**Booking ID:** {result['booking_id']}")
-                    st.write(f"**Patient:** {result['appointment_details']['patient']['name']}")
-                    st.write(f"**Type:** {result['appointment_details']['type']}")
-                    st.write(f"**Date:** {result['appointment_details']['date']}")
-                    st.write(f"**Time:** {result['appointment_details']['start_time']} - {result['appointment_details']['end_time']}")
-                    st.write(f"**Duration:** {result['appointment_details']['duration']} minutes")
+                    details = result['appointment_details']
+                    st.markdown(
+                        "**Booking Confirmation**  \n"
+                        f"**Booking ID:** {result['booking_id']}  \n"
+                        f"**Patient:** {details['patient']['name']}  \n"
+                        f"**Type:** {details['type']}  \n"
+                        f"**Date:** {details['date']}  \n"
+                        f"**Time:** {details['start_time']} - {details['end_time']}  \n"
+                        f"**Duration:** {details['duration']} minutes"
+                    )
                     st.markdown('</div>', unsafe_allow_html=True)
                     
                     st.balloons()
@@ -282,15 +393,15 @@ elif page == "📅 Book Appointment":
                     st.error(f"❌ Booking Failed: {result['error']}")
     
     # Show booking history
-    if st.session_state.booking_history:
+    if not st.session_state.booking_df.empty:
         st.markdown("---")
         st.subheader("📝 Recent Bookings (This Session)")
-        df_history = pd.DataFrame(st.session_state.booking_history)
-        st.dataframe(df_history, use_container_width=True, hide_index=True)
+        st.dataframe(st.session_state.booking_df, use_container_width=True, hide_index=True)
 
 # ==================== CHECK AVAILABILITY PAGE ====================
 elif page == "🔍 Check Availability":
     st.header("Check Available Time Slots")
+    today_date = datetime.now().date()
     
     col1, col2 = st.columns([1, 2])
     
@@ -299,8 +410,8 @@ elif page == "🔍 Check Availability":
         
         apt_type = st.selectbox(
             "Appointment Type",
-            options=list(APPOINTMENT_TYPES.keys()),
-            format_func=lambda x: APPOINTMENT_TYPES[x]['name']
+            options=APPOINTMENT_TYPE_KEYS,
+            format_func=APPOINTMENT_TYPE_NAMES.__getitem__
         )
         
         date_range = st.radio(
@@ -311,7 +422,7 @@ elif page == "🔍 Check Availability":
         if date_range == "Single Day":
             check_date = st.date_input(
                 "Select Date",
-                min_value=datetime.now().date()
+                min_value=today_date
             )
             start_date = check_date
             end_date = check_date
@@ -320,7 +431,7 @@ elif page == "🔍 Check Availability":
             with col_start:
                 start_date = st.date_input(
                     "Start Date",
-                    min_value=datetime.now().date()
+                    min_value=today_date
                 )
             with col_end:
                 end_date = st.date_input(
@@ -335,50 +446,43 @@ elif page == "🔍 Check Availability":
         st.subheader("Available Slots")
         
         if search_button:
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            end_datetime = datetime.combine(end_date, datetime.min.time())
+            start_datetime = datetime.combine(start_date, _MIDNIGHT)
+            end_datetime = datetime.combine(end_date, _MIDNIGHT)
             
             if date_range == "Single Day":
-                slots_info = managers['slots'].get_available_slots(start_datetime, apt_type)
-                
-                st.info(f"📅 {slots_info['date']} ({slots_info['day_of_week']})")
-                st.write(f"**Appointment Type:** {slots_info['appointment_type']}")
-                st.write(f"**Duration:** {slots_info['duration']} minutes")
-                st.write(f"**Available Slots:** {slots_info['total_slots']}")
+                slots_info = _slots().get_available_slots(start_datetime, apt_type)
                 
-                if slots_info['available_slots']:
-                    # Create DataFrame for display
-                    slots_df = pd.DataFrame(slots_info['available_slots'])
-                    st.dataframe(slots_df, use_container_width=True, hide_index=True)
-                    
-                    # Visualize slots
-                    fig = px.scatter(
-                        slots_df,
-                        x='start_time',
-                        y=[1]*len(slots_df),
-                        title=f"Available Slots Timeline - {slots_info['date']}",
-                        labels={'start_time': 'Time', 'y': ''},
-                        height=200
-                    )
-                    fig.update_yaxes(showticklabels=False)
-                    st.plotly_chart(fig, use_container_width=True)
+                if 'error' in slots_info:
+                    st.error(f"❌ {slots_info['message']}")
                 else:
-                    st.warning("No available slots for this date")
+                    st.info(f"📅 {slots_info['date']} ({slots_info['day_of_week']})")
+                    st.markdown(
+                        f"**Appointment Type:** {slots_info['appointment_type']}  \n"
+                        f"**Duration:** {slots_info['duration']} minutes  \n"
+                        f"**Available Slots:** {slots_info['total_slots']}"
+                    )
+                    
+                    if slots_info['available_slots']:
+                        # Create DataFrame for display
+                        slots_df = pd.DataFrame(slots_info['available_slots'])
+                        st.dataframe(slots_df, use_container_width=True, hide_index=True)
+                        
+                        # Visualize slots
+                        fig = _timeline_fig(slots_df, slots_info['date'])
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.warning("No available slots for this date")
             else:
-                slots_range = managers['slots'].get_available_slots_range(
+                slots_range = _slots().get_available_slots_range(
                     start_datetime, end_datetime, apt_type
                 )
                 
                 if slots_range:
-                    summary_data = []
-                    for day_slots in slots_range:
-                        summary_data.append({
-                            'Date': day_slots['date'],
-                            'Day': day_slots['day_of_week'],
-                            'Available Slots': day_slots['total_slots']
-                        })
-                    
-                    df_summary = pd.DataFrame(summary_data)
+                    df_summary = pd.DataFrame({
+                        'Date': [day_slots['date'] for day_slots in slots_range],
+                        'Day': [day_slots['day_of_week'] for day_slots in slots_range],
+                        'Available Slots': [day_slots['total_slots'] for day_slots in slots_range]
+                    })
                     st.dataframe(df_summary, use_container_width=True, hide_index=True)
                     
                     # Chart
@@ -397,32 +501,38 @@ elif page == "🔍 Check Availability":
 # ==================== SCHEDULE VIEW PAGE ====================
 elif page == "📊 Schedule View":
     st.header("Doctor's Schedule")
+    today_date = datetime.now().date()
     
     tab1, tab2 = st.tabs(["Working Hours", "Weekly Schedule"])
     
     with tab1:
         st.subheader("⏰ Working Hours Configuration")
         
-        working_hours = managers['schedule'].get_working_hours()
+        working_hours = _schedule().get_working_hours()
         
-        schedule_data = []
+        days, statuses, start_times, end_times = [], [], [], []
+        working_days = []
         for day, hours in working_hours.items():
-            schedule_data.append({
-                'Day': day.capitalize(),
-                'Status': '✅ Working' if hours['available'] else '❌ Off',
-                'Start Time': hours.get('start', 'N/A'),
-                'End Time': hours.get('end', 'N/A')
-            })
+            days.append(day.capitalize())
+            statuses.append('✅ Working' if hours['available'] else '❌ Off')
+            start_times.append(hours.get('start', 'N/A'))
+            end_times.append(hours.get('end', 'N/A'))
+            if hours['available']:
+                working_days.append(day.capitalize())
         
-        df_schedule = pd.DataFrame(schedule_data)
+        df_schedule = pd.DataFrame({
+            'Day': days,
+            'Status': statuses,
+            'Start Time': start_times,
+            'End Time': end_times
+        })
         st.dataframe(df_schedule, use_container_width=True, hide_index=True)
         
         # Visual representation
-        working_days = [d['Day'] for d in schedule_data if '✅' in d['Status']]
         fig = go.Figure(data=[
             go.Bar(
                 x=working_days,
-                y=[1]*len(working_days),
+                y=np.ones(len(working_days), np.int8),
                 marker_color='lightblue',
                 text=working_days,
                 textposition='auto'
@@ -442,31 +552,32 @@ elif page == "📊 Schedule View":
         
         start_date = st.date_input(
             "Week Starting From",
-            value=datetime.now().date()
+            value=today_date
         )
         
-        weekly_data = []
-        for i in range(7):
-            check_date = datetime.combine(start_date, datetime.min.time()) + timedelta(days=i)
-            summary = managers['schedule'].get_schedule_summary(check_date)
-            
-            weekly_data.append({
-                'Date': summary['date'],
-                'Day': summary['day_of_week'],
-                'Working': '✅' if summary['working_hours'].get('available') else '❌',
-                'Hours': f"{summary['working_hours'].get('start', 'N/A')} - {summary['working_hours'].get('end', 'N/A')}",
-                'Appointments': summary['total_appointments']
-            })
-        
-        df_weekly = pd.DataFrame(weekly_data)
+        dates, days, working, hours_range, appointment_counts = [], [], [], [], []
+        week_start = datetime.combine(start_date, _MIDNIGHT)
+        for summary in _schedule().get_schedule_summary_range(week_start, 7):
+            dates.append(summary['date'])
+            days.append(summary['day_of_week'])
+            working.append('✅' if summary['working_hours'].get('available') else '❌')
+            hours_range.append(f"{summary['working_hours'].get('start', 'N/A')} - {summary['working_hours'].get('end', 'N/A')}")
+            appointment_counts.append(summary['total_appointments'])
+        
+        df_weekly = pd.DataFrame({
+            'Date': dates,
+            'Day': days,
+            'Working': working,
+            'Hours': hours_range,
+            'Appointments': appointment_counts
+        })
         st.dataframe(df_weekly, use_container_width=True, hide_index=True)
 
 # ==================== APPOINTMENT TYPES PAGE ====================
 elif page == "⚙️ Appointment Types":
     st.header("Appointment Types Configuration")
     
-    types_list = managers['types'].list_all_types()
-    summary = managers['types'].get_types_summary()
+    summary = _types().get_types_summary()
     
     # Summary cards
     col1, col2, col3, col4 = st.columns(4)
@@ -485,30 +596,21 @@ elif page == "⚙️ Appointment Types":
     # Detailed table
     st.subheader("📋 All Appointment Types")
     
-    types_df = pd.DataFrame(types_list)
+    types_df = _types_df()
     
     # Color code by duration
-    def color_duration(val):
-        if val <= 20:
-            return 'background-color: #d4edda'
-        elif val <= 40:
-            return 'background-color: #fff3cd'
-        else:
-            return 'background-color: #f8d7da'
+    def color_duration(durations):
+        return np.select(
+            [durations <= 20, durations <= 40],
+            ['background-color: #d4edda', 'background-color: #fff3cd'],
+            default='background-color: #f8d7da'
+        )
     
-    styled_df = types_df.style.applymap(color_duration, subset=['duration'])
-    st.dataframe(types_df, use_container_width=True, hide_index=True)
+    styled_df = types_df.style.apply(color_duration, subset=['duration'])
+    st.dataframe(styled_df, use_container_width=True, hide_index=True)
     
     # Duration chart
-    fig = px.bar(
-        types_df,
-        x='name',
-        y='duration',
-        title='Appointment Durations',
-        labels={'name': 'Appointment Type', 'duration': 'Duration (minutes)'},
-        color='duration',
-        color_continuous_scale='Viridis'
-    )
+    fig = _durations_fig(types_df)
     st.plotly_chart(fig, use_container_width=True)
     
     # Filter by duration
@@ -521,18 +623,20 @@ elif page == "⚙️ Appointment Types":
     with col2:
         max_duration = st.number_input("Maximum Duration (min)", min_value=0, value=60)
     
-    filtered = managers['types'].filter_types_by_duration(min_duration, max_duration)
+    filtered = _types().filter_types_by_duration(min_duration, max_duration)
     
     if filtered:
-        st.write(f"Found {len(filtered)} appointment type(s):")
-        for apt in filtered:
-            st.write(f"- **{apt['name']}**: {apt['duration']} minutes - {apt['description']}")
+        st.markdown(
+            f"Found {len(filtered)} appointment type(s):\n\n"
+            + "\n".join(f"- **{apt['name']}**: {apt['duration']} minutes - {apt['description']}" for apt in filtered)
+        )
     else:
         st.info("No appointment types match the filter criteria")
 
 # ==================== ANALYTICS PAGE ====================
 elif page == "📈 Analytics":
     st.header("System Analytics")
+    today_date = datetime.now().date()
     
     tab1, tab2, tab3 = st.tabs(["Availability Trends", "Appointment Distribution", "Capacity Analysis"])
     
@@ -540,88 +644,29 @@ elif page == "📈 Analytics":
         st.subheader("📊 Availability Trends (Next 14 Days)")
         
         # Generate data for next 14 days
-        trend_data = []
-        today = datetime.now()
-        
-        for apt_type_key in APPOINTMENT_TYPES.keys():
-            for i in range(14):
-                check_date = today + timedelta(days=i)
-                slots_info = managers['slots'].get_available_slots(check_date, apt_type_key)
-                
-                trend_data.append({
-                    'Date': slots_info['date'],
-                    'Type': APPOINTMENT_TYPES[apt_type_key]['name'],
-                    'Available Slots': slots_info['total_slots']
-                })
-        
-        df_trends = pd.DataFrame(trend_data)
+        df_trends = _compute_trends(today_date, APPOINTMENT_TYPE_KEYS)
         
         # Line chart
-        fig = px.line(
-            df_trends,
-            x='Date',
-            y='Available Slots',
-            color='Type',
-            title='Available Slots Over Time',
-            markers=True
-        )
+        fig = _trend_fig(df_trends)
         st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
         st.subheader("📊 Appointment Type Distribution")
         
-        types_list = managers['types'].list_all_types()
-        df_types = pd.DataFrame(types_list)
+        df_types = _types_df()
         
         # Pie chart
-        fig = px.pie(
-            df_types,
-            names='name',
-            values='duration',
-            title='Time Distribution by Appointment Type'
-        )
+        fig = _distribution_fig(df_types)
         st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
         st.subheader("📊 Daily Capacity Analysis")
         
-        capacity_data = []
-        working_hours = managers['schedule'].get_working_hours()
-        
-        for day, hours in working_hours.items():
-            if hours['available']:
-                start = datetime.strptime(hours['start'], '%H:%M')
-                end = datetime.strptime(hours['end'], '%H:%M')
-                total_minutes = (end - start).seconds // 60
-                
-                capacity_data.append({
-                    'Day': day.capitalize(),
-                    'Total Minutes': total_minutes,
-                    'Potential 30-min Slots': total_minutes // 30,
-                    'Potential 60-min Slots': total_minutes // 60
-                })
-        
-        df_capacity = pd.DataFrame(capacity_data)
+        df_capacity = _compute_capacity()
         st.dataframe(df_capacity, use_container_width=True, hide_index=True)
         
         # Bar chart
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=df_capacity['Day'],
-            y=df_capacity['Potential 30-min Slots'],
-            name='30-min Slots'
-        ))
-        fig.add_trace(go.Bar(
-            x=df_capacity['Day'],
-            y=df_capacity['Potential 60-min Slots'],
-            name='60-min Slots'
-        ))
-        fig.update_layout(
-            title='Daily Appointment Capacity',
-            barmode='group',
-            xaxis_title='Day',
-            yaxis_title='Number of Slots'
-        )
+        fig = _capacity_fig(df_capacity)
         st.plotly_chart(fig, use_container_width=True)
 
 # Footer
@@ -2,7 +2,7 @@
 Calendly Doctor Appointment System - Main Package
 """
 
-from src.calendly_client import CalendlyAPI
+from src.calendly_client import CalendlyAPI, CalendlyAPIError
 from src.doctor_schedule import DoctorSchedule
 from src.available_slots import AvailableSlots
 from src.appointment_booking import AppointmentBooking
@@ -13,6 +13,7 @@ __author__ = "Assessment Project"
 
 __all__ = [
     'CalendlyAPI',
+    'CalendlyAPIError',
     'DoctorSchedule',
     'AvailableSlots',
     'AppointmentBooking',
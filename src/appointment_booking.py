@@ -3,11 +3,81 @@ Appointment Booking Module
 Handles creating new appointments with Calendly
 """
 
+from collections import Counter
+from dataclasses import asdict, dataclass
 from datetime import datetime
+import os
+import re
+from time import time_ns
 import uuid
-from src.calendly_client import CalendlyAPI
+from src.calendly_client import CalendlyAPI, CalendlyAPIError
 from src.available_slots import AvailableSlots
-from config.appointment_types import get_appointment_info, APPOINTMENT_TYPES
+from config.appointment_types import APPOINTMENT_TYPES
+
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_REQUIRED_FIELDS = ('appointment_type', 'date', 'time', 'patient_name', 'patient_email')
+_REQUIRED = frozenset(_REQUIRED_FIELDS)
+_STATUS_SCHEDULED = 'scheduled'
+_NEXT_STEPS = (
+    'Confirmation email will be sent to the patient',
+    'Calendar invite will be sent',
+    'Please arrive 10 minutes before appointment time'
+)
+
+
+def _new_booking_id():
+    """Time-ordered UUIDv7 (RFC 9562) hex string for a new booking"""
+    value = (time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | (0x7 << 76)  # version 7
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value).hex
+
+
+def _parse_date(date_str):
+    """Parse a YYYY-MM-DD string; raises ValueError if malformed"""
+    return datetime.strptime(date_str, '%Y-%m-%d')
+
+
+def _parse_time(time_str):
+    """Parse an HH:MM string; raises ValueError if malformed"""
+    return datetime.strptime(time_str, '%H:%M').time()
+
+
+@dataclass(slots=True)
+class Patient:
+    """
+    Patient contact details for a booking
+    """
+    name: str
+    email: str
+    phone: str = 'N/A'
+
+
+@dataclass(slots=True)
+class AppointmentDetails:
+    """
+    Details of a booked appointment
+    """
+    type: str
+    duration: int
+    date: str
+    start_time: str
+    end_time: str
+    patient: Patient
+    notes: str = ''
+    status: str = _STATUS_SCHEDULED
+
+
+@dataclass(slots=True, kw_only=True)
+class BookingResult:
+    """
+    Result of a successful booking; serialized with asdict at the API boundary
+    """
+    success: bool = True
+    booking_id: str
+    appointment_details: AppointmentDetails
+    message: str = 'Appointment booked successfully'
+    next_steps: tuple = _NEXT_STEPS
 
 
 class AppointmentBooking:
@@ -15,9 +85,11 @@ class AppointmentBooking:
     Manages appointment booking operations
     """
     
-    def __init__(self):
+    def __init__(self, available_slots=None):
         self.calendly = CalendlyAPI()
-        self.available_slots = AvailableSlots()
+        # Pass a shared slots manager so bookings invalidate the cache its callers read
+        self.available_slots = available_slots if available_slots is not None else AvailableSlots()
+        self._info = dict(APPOINTMENT_TYPES)  # appointment type key -> info snapshot
         
     def validate_appointment_data(self, appointment_data):
         """
@@ -29,33 +101,47 @@ class AppointmentBooking:
         Returns:
             tuple: (is_valid, error_message)
         """
-        required_fields = ['appointment_type', 'date', 'time', 'patient_name', 'patient_email']
+        error_message, _, _ = self._parse_appointment_data(appointment_data)
+        return error_message is None, error_message
+    
+    def _parse_appointment_data(self, appointment_data):
+        """
+        Validate appointment booking data and parse its date and time once
         
-        for field in required_fields:
-            if field not in appointment_data or not appointment_data[field]:
-                return False, f"Missing required field: {field}"
+        Args:
+            appointment_data (dict): Appointment data to validate
+            
+        Returns:
+            tuple: (error_message, appointment_date, appointment_time); the
+                parsed values are None when validation fails
+        """
+        missing = _REQUIRED.difference(key for key, value in appointment_data.items() if value)
+        if missing:
+            # Report the first missing field in declaration order
+            field = next(field for field in _REQUIRED_FIELDS if field in missing)
+            return f"Missing required field: {field}", None, None
         
         # Validate appointment type
-        if appointment_data['appointment_type'] not in APPOINTMENT_TYPES:
-            return False, f"Invalid appointment type: {appointment_data['appointment_type']}"
+        if appointment_data['appointment_type'] not in self._info:
+            return f"Invalid appointment type: {appointment_data['appointment_type']}", None, None
         
         # Validate date format
         try:
-            appointment_date = datetime.strptime(appointment_data['date'], '%Y-%m-%d')
+            appointment_date = _parse_date(appointment_data['date'])
         except ValueError:
-            return False, "Invalid date format. Use YYYY-MM-DD"
+            return "Invalid date format. Use YYYY-MM-DD", None, None
         
         # Validate time format
         try:
-            datetime.strptime(appointment_data['time'], '%H:%M')
+            appointment_time = _parse_time(appointment_data['time'])
         except ValueError:
-            return False, "Invalid time format. Use HH:MM"
+            return "Invalid time format. Use HH:MM", None, None
         
-        # Validate email format (basic)
-        if '@' not in appointment_data['patient_email']:
-            return False, "Invalid email format"
+        # Validate email format
+        if not _EMAIL_RE.match(appointment_data['patient_email']):
+            return "Invalid email format", None, None
         
-        return True, None
+        return None, appointment_date, appointment_time
     
     def check_slot_availability(self, appointment_type, date_str, time_str):
         """
@@ -69,26 +155,38 @@ class AppointmentBooking:
         Returns:
             tuple: (is_available, message)
         """
-        # Parse date and time
-        appointment_date = datetime.strptime(date_str, '%Y-%m-%d')
-        appointment_time = datetime.strptime(time_str, '%H:%M').time()
-        appointment_datetime = datetime.combine(appointment_date.date(), appointment_time)
+        slot, message = self._check_slot(appointment_type, _parse_date(date_str), date_str, time_str)
+        return slot is not None, message
+    
+    def _check_slot(self, appointment_type, appointment_date, date_str, time_str):
+        """
+        Check if a specific slot is available on an already parsed date
         
+        Args:
+            appointment_type (str): Type of appointment
+            appointment_date (datetime): Parsed appointment date
+            date_str (str): Date in YYYY-MM-DD format, used in messages
+            time_str (str): Time in HH:MM format
+            
+        Returns:
+            tuple: (slot, message) where slot is the matching available slot
+                dict, or None if the time is not available
+        """
         # Get available slots for the date
         slots_info = self.available_slots.get_available_slots(appointment_date, appointment_type)
         
         if 'error' in slots_info:
-            return False, slots_info['message']
+            return None, slots_info['message']
         
         if not slots_info['available_slots']:
-            return False, f"No available slots on {date_str}"
+            return None, f"No available slots on {date_str}"
         
         # Check if the requested time is in available slots
         for slot in slots_info['available_slots']:
             if slot['start_time'] == time_str:
-                return True, "Slot is available"
+                return slot, "Slot is available"
         
-        return False, f"Time slot {time_str} is not available on {date_str}"
+        return None, f"Time slot {time_str} is not available on {date_str}"
     
     def create_appointment(self, appointment_data):
         """
@@ -107,42 +205,42 @@ class AppointmentBooking:
         Returns:
             dict: Booking result
         """
-        # Validate data
-        is_valid, error_message = self.validate_appointment_data(appointment_data)
-        if not is_valid:
+        # Validate data, parsing the date and time once for the whole booking
+        error_message, appointment_date, _ = self._parse_appointment_data(appointment_data)
+        if error_message:
             return {
                 'success': False,
                 'error': error_message
             }
         
-        # Check slot availability
-        is_available, message = self.check_slot_availability(
+        # Check slot availability, keeping the matched slot for the booking
+        slot, message = self._check_slot(
             appointment_data['appointment_type'],
+            appointment_date,
             appointment_data['date'],
             appointment_data['time']
         )
         
-        if not is_available:
+        if slot is None:
             return {
                 'success': False,
                 'error': message
             }
         
         # Get appointment type info
-        appointment_info = get_appointment_info(appointment_data['appointment_type'])
-        
-        # Create appointment datetime
-        appointment_date = datetime.strptime(appointment_data['date'], '%Y-%m-%d')
-        appointment_time = datetime.strptime(appointment_data['time'], '%H:%M').time()
-        start_datetime = datetime.combine(appointment_date.date(), appointment_time)
+        appointment_info = self._info[appointment_data['appointment_type']]
         
         # In a real Calendly integration, you would use the scheduling link
         # For this implementation, we'll simulate the booking
-        booking_result = self._simulate_booking(appointment_data, appointment_info, start_datetime)
+        booking_result = self._simulate_booking(appointment_data, appointment_info, slot)
+        self.available_slots.invalidate_cache(appointment_date)
         
-        return booking_result
+        # The response has always carried next_steps as a list
+        result = asdict(booking_result)
+        result['next_steps'] = list(result['next_steps'])
+        return result
     
-    def _simulate_booking(self, appointment_data, appointment_info, start_datetime):
+    def _simulate_booking(self, appointment_data, appointment_info, slot):
         """
         Simulate booking an appointment
         In production, this would use Calendly's scheduling API or webhook
@@ -150,42 +248,30 @@ class AppointmentBooking:
         Args:
             appointment_data (dict): Appointment data
             appointment_info (dict): Appointment type info
-            start_datetime (datetime): Start datetime
+            slot (dict): Matched available slot with start and end times
             
         Returns:
-            dict: Booking result
+            BookingResult: Booking result
         """
-        from datetime import timedelta
-        
-        end_datetime = start_datetime + timedelta(minutes=appointment_info['duration'])
-        
         # Generate a unique booking ID
-        booking_id = str(uuid.uuid4())
-        
-        booking_result = {
-            'success': True,
-            'booking_id': booking_id,
-            'appointment_details': {
-                'type': appointment_info['name'],
-                'duration': appointment_info['duration'],
-                'date': appointment_data['date'],
-                'start_time': appointment_data['time'],
-                'end_time': end_datetime.strftime('%H:%M'),
-                'patient': {
-                    'name': appointment_data['patient_name'],
-                    'email': appointment_data['patient_email'],
-                    'phone': appointment_data.get('patient_phone', 'N/A')
-                },
-                'notes': appointment_data.get('notes', ''),
-                'status': 'scheduled'
-            },
-            'message': 'Appointment booked successfully',
-            'next_steps': [
-                'Confirmation email will be sent to the patient',
-                'Calendar invite will be sent',
-                'Please arrive 10 minutes before appointment time'
-            ]
-        }
+        booking_id = _new_booking_id()
+        
+        booking_result = BookingResult(
+            booking_id=booking_id,
+            appointment_details=AppointmentDetails(
+                type=appointment_info['name'],
+                duration=appointment_info['duration'],
+                date=appointment_data['date'],
+                start_time=appointment_data['time'],
+                end_time=slot['end_time'],
+                patient=Patient(
+                    name=appointment_data['patient_name'],
+                    email=appointment_data['patient_email'],
+                    phone=appointment_data.get('patient_phone', 'N/A')
+                ),
+                notes=appointment_data.get('notes', '')
+            )
+        )
         
         return booking_result
     
@@ -201,14 +287,17 @@ class AppointmentBooking:
             dict: Cancellation result
         """
         # In production, this would call Calendly's cancel API
-        result = self.calendly.cancel_event(booking_id, reason)
-        
-        if 'error' in result:
+        try:
+            self.calendly.cancel_event(booking_id, reason)
+        except CalendlyAPIError as e:
             return {
                 'success': False,
-                'error': result['message']
+                'error': str(e)
             }
         
+        # The cancelled appointment's date is not known here, so drop everything
+        self.available_slots.invalidate_cache()
+        
         return {
             'success': True,
             'message': 'Appointment cancelled successfully',
@@ -233,18 +322,19 @@ class AppointmentBooking:
             'success': True,
             'message': 'Appointment rescheduled successfully',
             'old_booking_id': booking_id,
-            'new_booking_id': str(uuid.uuid4()),
+            'new_booking_id': _new_booking_id(),
             'new_date': new_date,
             'new_time': new_time
         }
     
-    def get_booking_summary(self, start_date=None, end_date=None):
+    def get_booking_summary(self, start_date=None, end_date=None, include_details=True):
         """
         Get summary of all bookings in a date range
         
         Args:
             start_date (datetime): Start date
             end_date (datetime): End date
+            include_details (bool): Include the full appointments list
             
         Returns:
             dict: Booking summary
@@ -257,14 +347,10 @@ class AppointmentBooking:
         # Group by appointment type
         summary = {
             'total_appointments': len(appointments),
-            'by_type': {},
-            'appointments': appointments
+            'by_type': dict(Counter(apt.name for apt in appointments))
         }
         
-        for apt in appointments:
-            apt_name = apt.get('name', 'Unknown')
-            if apt_name not in summary['by_type']:
-                summary['by_type'][apt_name] = 0
-            summary['by_type'][apt_name] += 1
+        if include_details:
+            summary['appointments'] = appointments
         
         return summary
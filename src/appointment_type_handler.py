@@ -3,7 +3,12 @@ Appointment Type Handler
 Manages different appointment types and their specific durations
 """
 
-from config.appointment_types import APPOINTMENT_TYPES, get_appointment_duration, get_appointment_info
+from config.appointment_types import (
+    APPOINTMENT_TYPES,
+    APPOINTMENT_TYPES_SUMMARY,
+    get_appointment_duration,
+    get_appointment_info
+)
 
 
 class AppointmentTypeHandler:
@@ -13,23 +18,31 @@ class AppointmentTypeHandler:
     
     def __init__(self):
         self.appointment_types = APPOINTMENT_TYPES
+        
+        # The types table is static, so build the derived views once
+        self._types_list = [
+            {
+                'id': key,
+                'name': value['name'],
+                'duration': value['duration'],
+                'description': value['description']
+            }
+            for key, value in self.appointment_types.items()
+        ]
+        self._types_summary = {
+            **APPOINTMENT_TYPES_SUMMARY,
+            'types': self._types_list
+        }
+        self._types_table = self._build_types_table()
     
     def list_all_types(self):
         """
         List all available appointment types
         
         Returns:
-            list: List of appointment types with details
+            list: List of appointment types with details (shared, do not modify)
         """
-        types_list = []
-        for key, value in self.appointment_types.items():
-            types_list.append({
-                'id': key,
-                'name': value['name'],
-                'duration': value['duration'],
-                'description': value['description']
-            })
-        return types_list
+        return self._types_list
     
     def get_type_by_id(self, type_id):
         """
@@ -62,16 +75,27 @@ class AppointmentTypeHandler:
         Returns:
             str: Formatted table string
         """
-        header = f"{'Type':<30} {'Duration':<15} {'Description':<50}"
-        separator = "-" * 95
+        return self._types_table
+    
+    def _build_types_table(self):
+        """
+        Build the formatted appointment types table
         
-        rows = [header, separator]
+        Returns:
+            str: Formatted table string
+        """
+        rows = [
+            'Type'.ljust(30) + ' ' + 'Duration'.ljust(15) + ' ' + 'Description'.ljust(50),
+            '-' * 95
+        ]
         
-        for apt_type in self.list_all_types():
-            row = f"{apt_type['name']:<30} {apt_type['duration']} minutes{'':<6} {apt_type['description']:<50}"
-            rows.append(row)
+        for apt_type in self._types_list:
+            rows.append(
+                apt_type['name'].ljust(30) + ' ' + str(apt_type['duration']) + ' minutes'
+                + ' ' * 7 + apt_type['description'].ljust(50)
+            )
         
-        return "\n".join(rows)
+        return '\n'.join(rows)
     
     def validate_type(self, type_id):
         """
@@ -92,17 +116,7 @@ class AppointmentTypeHandler:
         Returns:
             dict: Summary information
         """
-        types = self.list_all_types()
-        total_types = len(types)
-        durations = [t['duration'] for t in types]
-        
-        return {
-            'total_types': total_types,
-            'shortest_duration': min(durations),
-            'longest_duration': max(durations),
-            'average_duration': sum(durations) / len(durations),
-            'types': types
-        }
+        return self._types_summary
     
     def filter_types_by_duration(self, min_duration=None, max_duration=None):
         """
@@ -4,9 +4,16 @@ Dynamically generates available time slots based on doctor's schedule and appoin
 """
 
 from datetime import datetime, timedelta, time
+from time import monotonic
+import threading
+import numpy as np
 import pytz
-from src.doctor_schedule import DoctorSchedule
-from config.appointment_types import get_appointment_duration, APPOINTMENT_TYPES
+from src.calendly_client import CalendlyAPIError
+from src.doctor_schedule import DoctorSchedule, merge_intervals, _EPOCH, _to_epoch
+from config.appointment_types import APPOINTMENT_TYPES
+
+# Most (date, appointment type) results kept in the availability cache
+_AVAIL_CACHE_SIZE = 256
 
 
 class AvailableSlots:
@@ -14,10 +21,41 @@ class AvailableSlots:
     Generates and manages available time slots for appointments
     """
     
-    def __init__(self):
-        self.doctor_schedule = DoctorSchedule()
+    def __init__(self, doctor_schedule=None):
+        # Pass a shared schedule so cache invalidation reaches all of its users
+        self.doctor_schedule = doctor_schedule if doctor_schedule is not None else DoctorSchedule()
         self.slot_interval = 15  # minutes - minimum time slot interval
+        self.cache_ttl = 60  # seconds - how long fetched availability is reused
+        self._avail_cache = {}  # (date, appointment type) -> (fetched at, result)
+        self._avail_lock = threading.Lock()  # instances are shared across threads and sessions
+        
+        # Parsed (start, end) working hours indexed by weekday, None when off
+        self._hours_by_weekday = list(self.doctor_schedule.get_working_times())
+        
+        # Bit i set when weekday i (Monday = 0) is a working day
+        self._working_bitmap = sum(1 << i for i, hours in enumerate(self._hours_by_weekday) if hours)
+        
+        # Slot start offsets from midnight and the closing offset, per weekday
+        self._slot_offsets = [
+            (self.generate_time_slots(hours[0], hours[1], _EPOCH, self.slot_interval),
+             _to_epoch(datetime.combine(_EPOCH.date(), hours[1])))
+            if hours is not None else None
+            for hours in self._hours_by_weekday
+        ]
+        self._duration_by_type = {key: info['duration'] * 60 for key, info in APPOINTMENT_TYPES.items()}
+        
+    def is_working_day(self, date):
+        """
+        Check if the doctor works on a given date, using the working-day bitmap
         
+        Args:
+            date (datetime): Date to check
+            
+        Returns:
+            bool: True if working day, False otherwise
+        """
+        return bool((self._working_bitmap >> date.weekday()) & 1)
+    
     def parse_time_string(self, time_str):
         """
         Parse time string to time object
@@ -32,7 +70,7 @@ class AvailableSlots:
     
     def generate_time_slots(self, start_time, end_time, date, interval=15):
         """
-        Generate all possible time slots within a time range
+        Generate all possible slot start times within a time range
         
         Args:
             start_time (time): Start time
@@ -41,113 +79,168 @@ class AvailableSlots:
             interval (int): Interval in minutes
             
         Returns:
-            list: List of datetime objects representing slots
+            numpy.ndarray: Slot start times as int64 epoch seconds
         """
-        slots = []
-        current_datetime = datetime.combine(date.date(), start_time)
-        end_datetime = datetime.combine(date.date(), end_time)
-        
-        while current_datetime < end_datetime:
-            slots.append(current_datetime)
-            current_datetime += timedelta(minutes=interval)
-        
-        return slots
+        start_epoch = _to_epoch(datetime.combine(date.date(), start_time))
+        end_epoch = _to_epoch(datetime.combine(date.date(), end_time))
+        return np.arange(start_epoch, end_epoch, interval * 60, dtype=np.int64)
     
-    def is_slot_available(self, slot_start, duration, busy_slots):
+    def get_available_slots(self, date, appointment_type, busy_slots=None):
         """
-        Check if a time slot is available (not overlapping with busy slots)
+        Get all available time slots for a specific date and appointment type
+        
+        Results computed from freshly fetched busy slots are cached for
+        cache_ttl seconds; the returned dict is shared and must not be modified.
+        Errors, including a failed busy-slots fetch, are never cached.
         
         Args:
-            slot_start (datetime): Start time of the slot
-            duration (int): Duration in minutes
-            busy_slots (list): List of busy time slots
+            date (datetime): Date to check availability
+            appointment_type (str): Type of appointment
+            busy_slots (list): Busy slots for the date, fetched if not given
             
         Returns:
-            bool: True if available, False otherwise
+            dict: Available slots information
         """
-        slot_end = slot_start + timedelta(minutes=duration)
+        if busy_slots is not None:
+            return self._compute_available_slots(date, appointment_type, busy_slots)
         
-        for busy in busy_slots:
-            # Parse busy slot times
-            busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-            busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-            
-            # Convert to naive datetime for comparison if needed
-            if busy_start.tzinfo:
-                busy_start = busy_start.replace(tzinfo=None)
-            if busy_end.tzinfo:
-                busy_end = busy_end.replace(tzinfo=None)
-            
-            # Check for overlap
-            if (slot_start < busy_end and slot_end > busy_start):
-                return False
+        cache_key = (date.strftime('%Y-%m-%d'), appointment_type)
+        now = monotonic()
+        with self._avail_lock:
+            cached = self._avail_cache.pop(cache_key, None)
+            if cached is not None and now - cached[0] < self.cache_ttl:
+                self._avail_cache[cache_key] = cached
+                return cached[1]
+        
+        result = self._compute_available_slots(date, appointment_type)
+        if 'error' in result:
+            return result
         
-        return True
+        # Evict the oldest entry once full; entries are kept in insertion order
+        with self._avail_lock:
+            if len(self._avail_cache) >= _AVAIL_CACHE_SIZE:
+                self._avail_cache.pop(next(iter(self._avail_cache)), None)
+            self._avail_cache[cache_key] = (now, result)
+        return result
     
-    def get_available_slots(self, date, appointment_type):
+    def invalidate_cache(self, date=None):
         """
-        Get all available time slots for a specific date and appointment type
+        Drop cached availability, e.g. after a booking or cancellation
+        
+        Args:
+            date (datetime): Only drop entries for this date (default: all)
+        """
+        if date is None:
+            self.doctor_schedule.invalidate_cache()
+            with self._avail_lock:
+                self._avail_cache.clear()
+            return
+        
+        start_of_day = datetime.combine(date.date(), time.min)
+        self.doctor_schedule.invalidate_cache(start_of_day, start_of_day + timedelta(days=1))
+        
+        date_str = date.strftime('%Y-%m-%d')
+        with self._avail_lock:
+            for cache_key in [key for key in self._avail_cache if key[0] == date_str]:
+                self._avail_cache.pop(cache_key, None)
+    
+    def _compute_available_slots(self, date, appointment_type, busy_slots=None):
+        """
+        Compute available time slots for a date without consulting the cache
         
         Args:
             date (datetime): Date to check availability
             appointment_type (str): Type of appointment
+            busy_slots (list): Busy slots for the date, fetched if not given
             
         Returns:
             dict: Available slots information
         """
         # Get appointment duration
-        duration = get_appointment_duration(appointment_type)
-        if not duration:
+        duration_sec = self._duration_by_type.get(appointment_type)
+        if not duration_sec:
             return {
                 'error': True,
                 'message': f'Invalid appointment type: {appointment_type}'
             }
         
         # Check if it's a working day
-        if not self.doctor_schedule.is_working_day(date):
+        if not self.is_working_day(date):
             return {
                 'date': date.strftime('%Y-%m-%d'),
+                'day_of_week': date.strftime('%A'),
                 'appointment_type': appointment_type,
-                'duration': duration,
+                'duration': duration_sec // 60,
                 'available_slots': [],
+                'total_slots': 0,
                 'message': 'Not a working day'
             }
         
-        # Get working hours for the day
-        day_name = date.strftime('%A').lower()
-        working_hours = self.doctor_schedule.get_working_hours()[day_name]
+        # Generate all possible slots from the precomputed offsets for the weekday
+        offsets, end_offset = self._slot_offsets[date.weekday()]
+        midnight = _to_epoch(datetime.combine(date.date(), time.min))
+        slot_starts = midnight + offsets
+        slot_ends = slot_starts + duration_sec
+        
+        # Get busy slots
+        if busy_slots is None:
+            try:
+                busy_slots = self.doctor_schedule.get_busy_time_slots(date)
+            except CalendlyAPIError as e:
+                return {
+                    'error': True,
+                    'message': f'Could not fetch existing appointments: {e}'
+                }
+        busy = merge_intervals(np.array(busy_slots, dtype=np.int64).reshape(-1, 2))
         
-        start_time = self.parse_time_string(working_hours['start'])
-        end_time = self.parse_time_string(working_hours['end'])
+        # Make sure the slot end time doesn't exceed working hours
+        available = slot_ends <= midnight + end_offset
         
-        # Generate all possible slots
-        all_slots = self.generate_time_slots(start_time, end_time, date, self.slot_interval)
+        # With disjoint sorted busy periods only the last one starting before
+        # the slot ends can overlap it
+        if len(busy):
+            i = np.searchsorted(busy[:, 0], slot_ends, side='left')
+            available &= (i == 0) | (busy[i - 1, 1] <= slot_starts)
         
-        # Get busy slots
-        busy_slots = self.doctor_schedule.get_busy_time_slots(date)
-        
-        # Filter available slots
-        available_slots = []
-        for slot in all_slots:
-            if self.is_slot_available(slot, duration, busy_slots):
-                # Make sure the slot end time doesn't exceed working hours
-                slot_end = slot + timedelta(minutes=duration)
-                if slot_end.time() <= end_time:
-                    available_slots.append({
-                        'start_time': slot.strftime('%H:%M'),
-                        'end_time': slot_end.strftime('%H:%M'),
-                        'datetime': slot.isoformat()
-                    })
+        starts_iso = np.datetime_as_string(slot_starts[available].astype('datetime64[s]'), unit='s')
+        ends_iso = np.datetime_as_string(slot_ends[available].astype('datetime64[s]'), unit='s')
+        available_slots = [
+            {
+                'start_time': start_iso[11:16],
+                'end_time': end_iso[11:16],
+                'datetime': start_iso
+            }
+            for start_iso, end_iso in zip(starts_iso.tolist(), ends_iso.tolist())
+        ]
         
         return {
             'date': date.strftime('%Y-%m-%d'),
             'day_of_week': date.strftime('%A'),
             'appointment_type': APPOINTMENT_TYPES[appointment_type]['name'],
-            'duration': duration,
+            'duration': duration_sec // 60,
             'available_slots': available_slots,
             'total_slots': len(available_slots)
         }
     
+    def is_day_fully_booked(self, date, appointment_type=None):
+        """
+        Check whether a date has no bookable slot left on the slot grid
+        
+        Args:
+            date (datetime): Date to check
+            appointment_type (str): Type of appointment that must still fit
+                (default: the shortest type)
+            
+        Returns:
+            bool: True if the day is fully booked or not a working day; False
+                when its appointments could not be fetched
+        """
+        if appointment_type is None:
+            appointment_type = min(self._duration_by_type, key=self._duration_by_type.get)
+        
+        slots_info = self.get_available_slots(date, appointment_type)
+        return 'error' not in slots_info and slots_info['total_slots'] == 0
+    
     def get_available_slots_range(self, start_date, end_date, appointment_type):
         """
         Get available slots for a date range
@@ -163,8 +256,12 @@ class AvailableSlots:
         results = []
         current_date = start_date
         
+        # Fetch busy slots for the whole range once, then slice per day
+        busy_by_day = self.doctor_schedule.get_busy_time_slots_range(start_date, end_date)
+        
         while current_date <= end_date:
-            slots = self.get_available_slots(current_date, appointment_type)
+            busy_slots = busy_by_day.get(current_date.strftime('%Y-%m-%d'), [])
+            slots = self.get_available_slots(current_date, appointment_type, busy_slots)
             if slots.get('available_slots'):  # Only include dates with available slots
                 results.append(slots)
             current_date += timedelta(days=1)
@@ -185,21 +282,24 @@ class AvailableSlots:
         if not start_from:
             start_from = datetime.now()
         
-        # Search for next 30 days
+        # Search for next 30 days, stopping at the first day with a free slot
         end_date = start_from + timedelta(days=30)
+        busy_by_day = self.doctor_schedule.get_busy_time_slots_range(start_from, end_date)
         
-        slots_range = self.get_available_slots_range(start_from, end_date, appointment_type)
-        
-        if slots_range and slots_range[0]['available_slots']:
-            first_day = slots_range[0]
-            first_slot = first_day['available_slots'][0]
-            return {
-                'found': True,
-                'date': first_day['date'],
-                'slot': first_slot,
-                'appointment_type': first_day['appointment_type'],
-                'duration': first_day['duration']
-            }
+        current_date = start_from
+        while current_date <= end_date:
+            if self.is_working_day(current_date):
+                busy_slots = busy_by_day.get(current_date.strftime('%Y-%m-%d'), [])
+                day = self.get_available_slots(current_date, appointment_type, busy_slots)
+                if day.get('available_slots'):
+                    return {
+                        'found': True,
+                        'date': day['date'],
+                        'slot': day['available_slots'][0],
+                        'appointment_type': day['appointment_type'],
+                        'duration': day['duration']
+                    }
+            current_date += timedelta(days=1)
         
         return {
             'found': False,
@@ -3,14 +3,28 @@ Calendly API Integration Module
 Handles all interactions with Calendly API
 """
 
+import orjson
 import requests
 import os
 from datetime import datetime, timedelta
+from itertools import islice
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
 
+class CalendlyAPIError(Exception):
+    """
+    Raised when a Calendly API request fails
+    """
+    
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
 class CalendlyAPI:
     """
     Main class for Calendly API integration
@@ -25,6 +39,13 @@ class CalendlyAPI:
             'Content-Type': 'application/json'
         }
         
+        # Reuse pooled keep-alive connections; retry idempotent requests on
+        # rate limiting and transient server errors
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+        self._session.headers.update(self.headers)
+        
     def _make_request(self, method, endpoint, params=None, data=None):
         """
         Make HTTP request to Calendly API
@@ -36,26 +57,45 @@ class CalendlyAPI:
             data (dict): Request body data
             
         Returns:
-            dict: API response or error message
+            dict: API response
+            
+        Raises:
+            CalendlyAPIError: If the request fails
         """
-        url = f"{self.base_url}{endpoint}"
+        return self._request(method, f"{self.base_url}{endpoint}", params=params, data=data)
+    
+    def _request(self, method, url, params=None, data=None):
+        """
+        Make HTTP request to an absolute Calendly API URL
         
+        Args:
+            method (str): HTTP method (GET, POST, etc.)
+            url (str): Full request URL, e.g. a pagination next_page link
+            params (dict): Query parameters
+            data (dict): Request body data
+            
+        Returns:
+            dict: API response
+            
+        Raises:
+            CalendlyAPIError: If the request fails
+        """
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
-                headers=self.headers,
                 params=params,
                 json=data
             )
             response.raise_for_status()
-            return response.json()
         except requests.exceptions.RequestException as e:
-            return {
-                'error': True,
-                'message': str(e),
-                'status_code': response.status_code if response else None
-            }
+            status_code = e.response.status_code if e.response is not None else None
+            raise CalendlyAPIError(str(e), status_code) from e
+        
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            raise CalendlyAPIError(f"Invalid JSON response: {e}", response.status_code) from e
     
     def get_user_info(self):
         """
@@ -76,30 +116,59 @@ class CalendlyAPI:
         params = {'user': self.user_uri}
         return self._make_request('GET', '/event_types', params=params)
     
-    def get_scheduled_events(self, start_time=None, end_time=None, status='active'):
+    def get_scheduled_events(self, start_time=None, end_time=None, status='active', count=100, max_events=None):
         """
-        Get scheduled events (appointments) for the user
+        Get scheduled events (appointments) for the user, following pagination
         
         Args:
             start_time (str): Start time in ISO format
             end_time (str): End time in ISO format
-            status (str): Event status (active, canceled)
+            status (str): Event status (active, canceled, or None for all)
+            count (int): Page size requested from Calendly (max 100)
+            max_events (int): Stop after this many events (default: all)
             
         Returns:
-            dict: List of scheduled events
+            dict: List of scheduled events under 'collection'
+        """
+        events = self.iter_scheduled_events(start_time, end_time, status, count)
+        return {'collection': list(islice(events, max_events))}
+    
+    def iter_scheduled_events(self, start_time=None, end_time=None, status='active', count=100):
+        """
+        Lazily yield scheduled events page by page, following pagination.next_page
+        
+        Args:
+            start_time (str): Start time in ISO format
+            end_time (str): End time in ISO format
+            status (str): Event status (active, canceled, or None for all)
+            count (int): Page size requested from Calendly (max 100)
+            
+        Yields:
+            dict: One scheduled event
         """
         if not start_time:
             start_time = datetime.utcnow().isoformat() + 'Z'
         if not end_time:
             end_time = (datetime.utcnow() + timedelta(days=30)).isoformat() + 'Z'
             
+        endpoint = '/scheduled_events'
         params = {
             'user': self.user_uri,
             'min_start_time': start_time,
             'max_start_time': end_time,
-            'status': status
+            'count': count
         }
-        return self._make_request('GET', '/scheduled_events', params=params)
+        if status is not None:
+            params['status'] = status
+        page = self._make_request('GET', endpoint, params=params)
+        while True:
+            yield from page.get('collection', [])
+            
+            # next_page is an absolute URL that already carries the query string
+            next_page = (page.get('pagination') or {}).get('next_page')
+            if not next_page:
+                return
+            page = self._request('GET', next_page)
     
     def get_event_details(self, event_uuid):
         """
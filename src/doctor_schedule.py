@@ -3,9 +3,156 @@ Doctor Schedule Management
 Handles fetching and managing doctor's schedules, working hours, and existing appointments
 """
 
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from functools import cached_property, lru_cache
+import logging
+import threading
+from operator import itemgetter
+from time import monotonic
+from types import MappingProxyType
+import numpy as np
 import pytz
-from src.calendly_client import CalendlyAPI
+from src.calendly_client import CalendlyAPI, CalendlyAPIError
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Fields read from each Calendly scheduled event (all required by the API schema).
+# The API has no sparse fieldsets, so the rest of each event is dropped here at
+# decode time; responses are already gzip-compressed by requests' defaults
+_EVENT_FIELDS = itemgetter('uri', 'name', 'start_time', 'end_time', 'status', 'location', 'invitees_counter')
+
+# Most query ranges kept in the scheduled events cache
+_EVENTS_CACHE_SIZE = 256
+
+# Concurrent Calendly requests when fetching several days at once
+_MAX_FETCH_WORKERS = 8
+
+# Longer query ranges are split into windows of this size and fetched concurrently
+_FETCH_WINDOW = timedelta(days=60)
+
+# Day names in datetime.weekday() order
+_DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Default working hours (can be customized); read-only so it can be shared
+_WORKING_HOURS = MappingProxyType({
+    day: MappingProxyType(hours)
+    for day, hours in {
+        'monday': {'start': '09:00', 'end': '17:00', 'available': True},
+        'tuesday': {'start': '09:00', 'end': '17:00', 'available': True},
+        'wednesday': {'start': '09:00', 'end': '17:00', 'available': True},
+        'thursday': {'start': '09:00', 'end': '17:00', 'available': True},
+        'friday': {'start': '09:00', 'end': '17:00', 'available': True},
+        'saturday': {'start': '10:00', 'end': '14:00', 'available': True},
+        'sunday': {'start': None, 'end': None, 'available': False}
+    }.items()
+})
+
+assert set(_DAYS) == set(_WORKING_HOURS)
+
+# Working hours indexed by weekday, so lookups skip formatting the day name
+_WORKING_HOURS_BY_IDX = tuple(_WORKING_HOURS[day] for day in _DAYS)
+
+# Parsed (start, end) times indexed by weekday, None on days off
+_WORKING_TIMES = tuple(
+    (time.fromisoformat(_WORKING_HOURS[day]['start']), time.fromisoformat(_WORKING_HOURS[day]['end']))
+    if _WORKING_HOURS[day]['available'] else None
+    for day in _DAYS
+)
+
+# Working minutes per day indexed by weekday, 0 on days off
+_WORKING_MINUTES = tuple(
+    (times[1].hour * 60 + times[1].minute) - (times[0].hour * 60 + times[0].minute)
+    if times is not None else 0
+    for times in _WORKING_TIMES
+)
+
+def _to_epoch(dt):
+    """Seconds since the epoch for a naive datetime (no timezone conversion)"""
+    return (dt - _EPOCH) // timedelta(seconds=1)
+
+
+@lru_cache(maxsize=4096)
+def _iso_to_epoch(iso_str):
+    """Epoch seconds for an ISO 8601 string, compared as naive wall-clock time"""
+    return _to_epoch(datetime.fromisoformat(iso_str.replace('Z', '+00:00')).replace(tzinfo=None))
+
+
+@lru_cache(maxsize=512)
+def _day_bounds(day):
+    """Start and end datetimes of a calendar day with their Calendly ISO strings"""
+    start_of_day = datetime.combine(day, time.min)
+    end_of_day = datetime.combine(day, time.max)
+    return start_of_day, end_of_day, start_of_day.isoformat() + 'Z', end_of_day.isoformat() + 'Z'
+
+
+def merge_intervals(intervals):
+    """
+    Merge overlapping or touching intervals
+    
+    Args:
+        intervals (numpy.ndarray): (N, 2) int64 array of (start, end) epoch seconds
+        
+    Returns:
+        numpy.ndarray: Sorted, disjoint (M, 2) int64 intervals covering the same time
+    """
+    if len(intervals) == 0:
+        return intervals.reshape(0, 2)
+    
+    intervals = intervals[intervals[:, 0].argsort(kind='stable')]
+    ends = np.maximum.accumulate(intervals[:, 1])
+    
+    # A segment starts wherever an interval begins after everything before it ended,
+    # and ends at the running max just before the next segment starts
+    new_segment = np.empty(len(intervals), dtype=bool)
+    new_segment[0] = True
+    new_segment[1:] = intervals[1:, 0] > ends[:-1]
+    first = np.flatnonzero(new_segment)
+    last = np.append(first[1:] - 1, len(intervals) - 1)
+    return np.column_stack((intervals[first, 0], ends[last]))
+
+
+@dataclass(slots=True, frozen=True)
+class Appointment:
+    """
+    An existing appointment fetched from Calendly
+    """
+    id: str
+    name: str
+    start_time: str
+    end_time: str
+    status: str
+    location: dict
+    invitees_counter: dict
+    start_epoch: int  # start_time as epoch seconds, parsed once at fetch time
+    end_epoch: int
+
+
+def _to_appointment(event):
+    """
+    Build an Appointment from a Calendly scheduled event
+    
+    Args:
+        event (dict): Scheduled event from the API
+        
+    Returns:
+        Appointment: Appointment record
+    """
+    uri, name, start_time, end_time, status, location, invitees_counter = _EVENT_FIELDS(event)
+    return Appointment(
+        uri.rsplit('/', 1)[-1],
+        name,
+        start_time,
+        end_time,
+        status,
+        location,
+        invitees_counter,
+        _iso_to_epoch(start_time),
+        _iso_to_epoch(end_time)
+    )
 
 
 class DoctorSchedule:
@@ -15,6 +162,9 @@ class DoctorSchedule:
     
     def __init__(self):
         self.calendly = CalendlyAPI()
+        self.events_cache_ttl = 90  # seconds - appointments change on the order of minutes
+        self._events_cache = {}  # (start_iso, end_iso) -> (fetched at, start, end, appointments)
+        self._events_lock = threading.Lock()  # instances are shared across threads and sessions
         
     def get_working_hours(self):
         """
@@ -22,65 +172,231 @@ class DoctorSchedule:
         In a real implementation, this would come from Calendly availability rules
         
         Returns:
-            dict: Working hours by day of week
-        """
-        # Default working hours (can be customized)
-        working_hours = {
-            'monday': {'start': '09:00', 'end': '17:00', 'available': True},
-            'tuesday': {'start': '09:00', 'end': '17:00', 'available': True},
-            'wednesday': {'start': '09:00', 'end': '17:00', 'available': True},
-            'thursday': {'start': '09:00', 'end': '17:00', 'available': True},
-            'friday': {'start': '09:00', 'end': '17:00', 'available': True},
-            'saturday': {'start': '10:00', 'end': '14:00', 'available': True},
-            'sunday': {'start': None, 'end': None, 'available': False}
-        }
-        return working_hours
+            MappingProxyType: Read-only working hours by day of week
+        """
+        return _WORKING_HOURS
+    
+    def get_working_times(self):
+        """
+        Get working hours as parsed time objects, indexed by weekday (Monday is 0)
+        
+        Returns:
+            tuple: (start, end) time pairs, or None for days off
+        """
+        return _WORKING_TIMES
+    
+    @cached_property
+    def working_mask(self):
+        """
+        Working-day flags indexed by weekday (Monday is 0)
+        
+        Returns:
+            tuple: Seven booleans, True for working days
+        """
+        working_hours = self.get_working_hours()
+        return tuple(working_hours[day]['available'] for day in _DAYS)
+    
+    @cached_property
+    def working_days_count(self):
+        """
+        Number of working days per week
+        
+        Returns:
+            int: Count of working days
+        """
+        return sum(self.working_mask)
+    
+    @cached_property
+    def working_minutes_array(self):
+        """
+        Working minutes for each working day
+        
+        Returns:
+            tuple: (list of day names, numpy int16 array of working minutes)
+        """
+        working_mask = self.working_mask
+        days = [day.capitalize() for day, working in zip(_DAYS, working_mask) if working]
+        minutes = [minutes for minutes, working in zip(_WORKING_MINUTES, working_mask) if working]
+        return days, np.array(minutes, dtype=np.int16)
     
-    def get_existing_appointments(self, start_date=None, end_date=None):
+    def get_existing_appointments(self, start_date=None, end_date=None, date=None, status='active', raise_errors=False):
         """
         Fetch all existing appointments for the doctor
         
         Args:
             start_date (datetime): Start date for query
             end_date (datetime): End date for query
+            date (datetime): Query this whole day instead of start_date/end_date
+            status (str): Event status filtered by Calendly (active, canceled, or None for all)
+            raise_errors (bool): Raise on a failed fetch instead of returning no appointments
             
         Returns:
-            list: List of existing appointments
+            list: Appointment records (the list is shared with the cache, do not modify)
+            
+        Raises:
+            CalendlyAPIError: If the fetch fails and raise_errors is set
         """
-        if not start_date:
-            start_date = datetime.utcnow()
-        if not end_date:
-            end_date = start_date + timedelta(days=30)
+        if date is not None:
+            start_date, end_date, start_time_str, end_time_str = _day_bounds(date.date())
+        else:
+            if not start_date:
+                start_date = datetime.utcnow()
+            if not end_date:
+                end_date = start_date + timedelta(days=30)
             
-        start_time_str = start_date.isoformat() + 'Z'
-        end_time_str = end_date.isoformat() + 'Z'
+            start_time_str = start_date.isoformat() + 'Z'
+            end_time_str = end_date.isoformat() + 'Z'
         
-        # Fetch scheduled events from Calendly
-        response = self.calendly.get_scheduled_events(
-            start_time=start_time_str,
-            end_time=end_time_str
-        )
+        # Reuse the events recently fetched for the same range
+        cache_key = (start_time_str, end_time_str, status)
+        with self._events_lock:
+            cached = self._events_cache.pop(cache_key, None)
+            if cached is not None and monotonic() - cached[0] < self.events_cache_ttl:
+                self._events_cache[cache_key] = cached
+                return cached[3]
         
-        if 'error' in response:
-            print(f"Error fetching appointments: {response['message']}")
+        # Fetch scheduled events from Calendly
+        try:
+            appointments = self._fetch_appointments(start_date, end_date, status)
+        except CalendlyAPIError as e:
+            if raise_errors:
+                raise
+            logger.warning("Error fetching appointments: %s", e)
             return []
         
-        appointments = []
-        if 'collection' in response:
-            for event in response['collection']:
-                appointment = {
-                    'id': event.get('uri', '').split('/')[-1],
-                    'name': event.get('name'),
-                    'start_time': event.get('start_time'),
-                    'end_time': event.get('end_time'),
-                    'status': event.get('status'),
-                    'location': event.get('location'),
-                    'invitees_counter': event.get('invitees_counter', {})
-                }
-                appointments.append(appointment)
-        
+        self._store_events(start_date, end_date, status, appointments)
         return appointments
     
+    def _fetch_appointments(self, start_date, end_date, status='active'):
+        """
+        Fetch appointments for a range, following pagination
+        
+        Events are converted as each page streams in, so only one page of raw
+        JSON is held at a time. Calendly pages are linked by cursor, so pages of
+        one query cannot be requested in parallel; instead a range longer than
+        _FETCH_WINDOW is split into windows whose pages are followed concurrently
+        on a thread pool created for the call. The callers in this repo ask for
+        31 days or fewer, so they always make a single query.
+        
+        Args:
+            start_date (datetime): Start of the range
+            end_date (datetime): End of the range
+            status (str): Event status filtered by Calendly, or None for all
+            
+        Returns:
+            list: Appointment records ordered by window
+            
+        Raises:
+            CalendlyAPIError: If any request fails
+        """
+        windows = []
+        window_start = start_date
+        while end_date - window_start > _FETCH_WINDOW:
+            window_end = window_start + _FETCH_WINDOW
+            windows.append((window_start.isoformat() + 'Z', (window_end - timedelta(microseconds=1)).isoformat() + 'Z'))
+            window_start = window_end
+        windows.append((window_start.isoformat() + 'Z', end_date.isoformat() + 'Z'))
+        
+        def fetch(window):
+            events = self.calendly.iter_scheduled_events(start_time=window[0], end_time=window[1], status=status)
+            return [_to_appointment(event) for event in events]
+        
+        if len(windows) == 1:
+            return fetch(windows[0])
+        
+        with ThreadPoolExecutor(max_workers=min(_MAX_FETCH_WORKERS, len(windows))) as executor:
+            return [appointment for appointments in executor.map(fetch, windows) for appointment in appointments]
+    
+    def _store_events(self, start_date, end_date, status, appointments, fetched_at=None):
+        """
+        Cache the appointments fetched for a query range
+        
+        Args:
+            start_date (datetime): Start of the range
+            end_date (datetime): End of the range
+            status (str): Event status the appointments were filtered by
+            appointments (list): Appointments in the range
+            fetched_at (float): monotonic() time of the fetch (default: now)
+        """
+        if fetched_at is None:
+            fetched_at = monotonic()
+        cache_key = (start_date.isoformat() + 'Z', end_date.isoformat() + 'Z', status)
+        
+        # Evict the oldest range once full; entries are kept in insertion order
+        with self._events_lock:
+            self._events_cache.pop(cache_key, None)
+            if len(self._events_cache) >= _EVENTS_CACHE_SIZE:
+                self._events_cache.pop(next(iter(self._events_cache)), None)
+            self._events_cache[cache_key] = (fetched_at, start_date, end_date, appointments)
+    
+    def prefetch_range(self, start_date, end_date, status='active'):
+        """
+        Fetch appointments for a date range once and cache them per day, so that
+        later single-day queries within the range skip the Calendly request
+        
+        Args:
+            start_date (datetime): First date of the range
+            end_date (datetime): Last date of the range (inclusive)
+            status (str): Event status filtered by Calendly, or None for all
+            
+        Returns:
+            dict: Appointments keyed by date string (YYYY-MM-DD) for every day in range
+        """
+        start_of_range = datetime.combine(start_date.date(), time.min)
+        end_of_range = datetime.combine(end_date.date(), time.max)
+        
+        appointments = self.get_existing_appointments(start_of_range, end_of_range, status=status)
+        
+        days = []
+        events_by_day = {}
+        day = start_of_range
+        while day <= end_of_range:
+            days.append(day)
+            events_by_day[day.strftime('%Y-%m-%d')] = []
+            day += timedelta(days=1)
+        
+        # Bucket appointments by their start date
+        for appointment in appointments:
+            bucket = events_by_day.get((appointment.start_time or '')[:10])
+            if bucket is not None:
+                bucket.append(appointment)
+        
+        # Only a successful fetch is cached; never record empty days for a failed one.
+        # Day entries keep the range's fetch time so they expire with the data
+        with self._events_lock:
+            cached = self._events_cache.get((start_of_range.isoformat() + 'Z', end_of_range.isoformat() + 'Z', status))
+        if cached is not None:
+            for day in days:
+                start_of_day, end_of_day, _, _ = _day_bounds(day.date())
+                self._store_events(start_of_day, end_of_day, status, events_by_day[day.strftime('%Y-%m-%d')],
+                                   fetched_at=cached[0])
+        
+        return events_by_day
+    
+    def invalidate_cache(self, start_date=None, end_date=None):
+        """
+        Drop cached appointments so the next query refetches from Calendly
+        Call after creating or cancelling appointments
+        
+        Args:
+            start_date (datetime): Start of the changed range (default: drop everything)
+            end_date (datetime): End of the changed range (default: start_date)
+        """
+        if end_date is None:
+            end_date = start_date
+        
+        with self._events_lock:
+            if start_date is None:
+                self._events_cache.clear()
+                return
+            
+            stale = [
+                key for key, (_, cached_start, cached_end, _) in self._events_cache.items()
+                if cached_start <= end_date and start_date <= cached_end
+            ]
+            for key in stale:
+                del self._events_cache[key]
+    
     def get_schedule_summary(self, date=None):
         """
         Get a comprehensive schedule summary for a specific date
@@ -94,24 +410,77 @@ class DoctorSchedule:
         if not date:
             date = datetime.now()
             
-        day_name = date.strftime('%A').lower()
-        working_hours = self.get_working_hours()
-        
-        # Get appointments for the specific day
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        weekday = date.weekday()
+        day_name = _DAYS[weekday]
         
-        appointments = self.get_existing_appointments(start_of_day, end_of_day)
+        # Nothing can be booked on a day off, so skip the Calendly request
+        if not self.working_mask[weekday]:
+            appointments = []
+        else:
+            appointments = self.get_existing_appointments(date=date)
         
-        summary = {
+        return {
             'date': date.strftime('%Y-%m-%d'),
             'day_of_week': day_name.capitalize(),
-            'working_hours': working_hours.get(day_name, {}),
+            'working_hours': dict(_WORKING_HOURS[day_name]),
             'total_appointments': len(appointments),
             'appointments': appointments
         }
+    
+    def get_schedule_summaries(self, dates):
+        """
+        Get schedule summaries for arbitrary dates, fetching them concurrently
         
-        return summary
+        Args:
+            dates (list): Dates (datetime) to summarize
+            
+        Returns:
+            list: Schedule summary for each date, in the given order
+        """
+        dates = list(dates)
+        if len(dates) <= 1:
+            return [self.get_schedule_summary(date) for date in dates]
+        
+        # Each day is an independent request; the pooled session is shared across threads
+        with ThreadPoolExecutor(max_workers=min(_MAX_FETCH_WORKERS, len(dates))) as executor:
+            return list(executor.map(self.get_schedule_summary, dates))
+    
+    def get_schedule_summary_range(self, start_date, n_days=7):
+        """
+        Get schedule summaries for consecutive days with a single appointments fetch
+        
+        Args:
+            start_date (datetime): First date of the range
+            n_days (int): Number of days to summarize
+            
+        Returns:
+            list: Schedule summary for each day, in date order
+        """
+        working_hours = self.get_working_hours()
+        working_mask = self.working_mask
+        
+        start_of_range = datetime.combine(start_date.date(), time.min)
+        appointments_by_day = self.prefetch_range(start_of_range, start_of_range + timedelta(days=n_days - 1))
+        
+        summaries = []
+        for i in range(n_days):
+            date = start_of_range + timedelta(days=i)
+            date_str = date.strftime('%Y-%m-%d')
+            weekday = date.weekday()
+            day_name = _DAYS[weekday]
+            
+            # Days off report no appointments, matching get_schedule_summary
+            day_appointments = appointments_by_day.get(date_str, []) if working_mask[weekday] else []
+            
+            summaries.append({
+                'date': date_str,
+                'day_of_week': day_name.capitalize(),
+                'working_hours': dict(working_hours[day_name]),
+                'total_appointments': len(day_appointments),
+                'appointments': day_appointments
+            })
+        
+        return summaries
     
     def is_working_day(self, date):
         """
@@ -123,9 +492,7 @@ class DoctorSchedule:
         Returns:
             bool: True if working day, False otherwise
         """
-        day_name = date.strftime('%A').lower()
-        working_hours = self.get_working_hours()
-        return working_hours.get(day_name, {}).get('available', False)
+        return _WORKING_HOURS_BY_IDX[date.weekday()]['available']
     
     def get_busy_time_slots(self, date):
         """
@@ -135,19 +502,53 @@ class DoctorSchedule:
             date (datetime): Date to check
             
         Returns:
-            list: List of busy time slots
+            list: Busy time slots as (start, end) epoch-second tuples
+            
+        Raises:
+            CalendlyAPIError: If the appointments could not be fetched, since
+                treating the day as free would offer taken slots
         """
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        if not self.working_mask[date.weekday()]:
+            return []
         
-        appointments = self.get_existing_appointments(start_of_day, end_of_day)
+        # Calendly filters to active events, so every returned appointment is busy
+        appointments = self.get_existing_appointments(date=date, status='active', raise_errors=True)
         
-        busy_slots = []
-        for appointment in appointments:
-            if appointment['status'] == 'active':
-                busy_slots.append({
-                    'start': appointment['start_time'],
-                    'end': appointment['end_time']
-                })
+        return [(appointment.start_epoch, appointment.end_epoch) for appointment in appointments]
+    
+    def busy_intervals_np(self, date):
+        """
+        Get the busy periods for a specific date as a merged numpy array
+        
+        Args:
+            date (datetime): Date to check
+            
+        Returns:
+            numpy.ndarray: Sorted, disjoint (N, 2) int64 array of (start, end) epoch seconds
+            
+        Raises:
+            CalendlyAPIError: If the appointments could not be fetched
+        """
+        return merge_intervals(np.array(self.get_busy_time_slots(date), dtype=np.int64).reshape(-1, 2))
+    
+    def get_busy_time_slots_range(self, start_date, end_date):
+        """
+        Get busy (booked) time slots for every day in a date range with a single fetch
+        
+        Args:
+            start_date (datetime): First date of the range
+            end_date (datetime): Last date of the range (inclusive)
+            
+        Returns:
+            dict: Busy (start, end) epoch-second tuples keyed by date string (YYYY-MM-DD)
+        """
+        working_mask = self.working_mask
+        first_weekday = start_date.weekday()
+        
+        # Days come back in date order; days off have no busy slots, matching get_busy_time_slots
+        busy_by_day = {}
+        for i, (day_key, appointments) in enumerate(self.prefetch_range(start_date, end_date, status='active').items()):
+            if appointments and working_mask[(first_weekday + i) % 7]:
+                busy_by_day[day_key] = [(appointment.start_epoch, appointment.end_epoch) for appointment in appointments]
         
-        return busy_slots
+        return busy_by_day